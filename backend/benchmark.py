@@ -0,0 +1,197 @@
+"""
+GhostShell License Server benchmarks
+Run with: python backend/benchmark.py
+"""
+
+import os
+import json
+import timeit
+import tempfile
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import msgpack
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+import main
+
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", 20000))
+STORAGE_ITERATIONS = int(os.getenv("BENCH_STORAGE_ITERATIONS", 2000))
+
+def report(name: str, seconds: float, baseline: float = None, size: int = None, iterations: int = ITERATIONS):
+    per_request_us = seconds / iterations * 1e6
+    line = f"  {name:<40} {per_request_us:8.2f} us/request"
+    if size is not None:
+        line += f"  {size:5d} bytes"
+    if baseline:
+        line += f"  ({baseline / seconds:.2f}x)"
+    print(line)
+
+def run_coroutine(coroutine):
+    """Drive a coroutine that never suspends, without the overhead of an event loop"""
+    try:
+        coroutine.send(None)
+    except StopIteration as e:
+        return e.value
+    raise RuntimeError("Coroutine suspended")
+
+def bench_serialization():
+    """Compare the /activate route's decode and encode path under each response class"""
+    print("Validation request decode + response encode (as the /activate route runs it):")
+
+    route = next(route for route in main.app.routes if getattr(route, "path", None) == "/activate")
+    request_payload = {
+        "license_key": "GHOST-SHELL-PRO-1A2B-3C4D-5E6F",
+        "fingerprint": {
+            "machine_id": "215893018572341",
+            "platform": "Windows",
+            "arch": "AMD64",
+            "ip": "unknown"
+        },
+        "timestamp": datetime.utcnow().isoformat(),
+        "version": "1.0.0"
+    }
+    json_body = json.dumps(request_payload).encode()
+    msgpack_body = msgpack.packb(request_payload)
+    response = main.LicenseValidationResponse(
+        valid=True,
+        expires_at=(datetime.utcnow() + timedelta(days=365)).isoformat(),
+        message="License activated successfully",
+        remaining_validations=9999
+    )
+
+    def handle(body: bytes, response_class) -> bytes:
+        # Starlette's request.json(), the body field validation, then response_model serialization
+        route.body_field.validate(json.loads(body), {}, loc=("body",))
+        content = run_coroutine(serialize_response(field=route.response_field, response_content=response))
+        return response_class(content).body
+
+    def default_path():
+        return handle(json_body, JSONResponse)
+
+    def orjson_path():
+        return handle(json_body, main.NegotiatedResponse)
+
+    def msgpack_path():
+        # MsgPackRoute re-encodes the MessagePack body as JSON before FastAPI parses it
+        token = main._wire_format.set("msgpack")
+        try:
+            return handle(orjson.dumps(msgpack.unpackb(msgpack_body)), main.NegotiatedResponse)
+        finally:
+            main._wire_format.reset(token)
+
+    baseline = timeit.timeit(default_path, number=ITERATIONS)
+    report("JSONResponse (FastAPI default)", baseline, size=len(json_body) + len(default_path()))
+    report("ORJSONResponse (current)", timeit.timeit(orjson_path, number=ITERATIONS), baseline, len(json_body) + len(orjson_path()))
+    report("MessagePack", timeit.timeit(msgpack_path, number=ITERATIONS), baseline, len(msgpack_body) + len(msgpack_path()))
+
+def storage_backends():
+    """Fresh instances of each storage backend, keyed by name"""
+    main.Base.metadata.drop_all(bind=main.engine)
+    main.Base.metadata.create_all(bind=main.engine)
+    return {
+        "sql": main.SqlStorage(main.SessionLocal()),
+        "memory": main.MemoryStorage(tempfile.mkdtemp())
+    }
+
+class ConformanceError(Exception):
+    """A storage backend broke the contract the routes rely on"""
+
+def expect(condition: bool, description: str):
+    # Explicit check rather than an assert statement, which python -O strips
+    if not condition:
+        raise ConformanceError(description)
+
+def check_storage_conformance(storage: main.LicenseStorage):
+    """Exercise the storage contract the routes rely on"""
+    name = type(storage).__name__
+    expires_at = datetime.utcnow() + timedelta(days=30)
+    expect(storage.create_license("CONFORM-1", expires_at, 2), f"{name}: create a new license")
+    expect(not storage.create_license("CONFORM-1", expires_at, 2), f"{name}: reject a duplicate license")
+    expect(storage.get_license("missing") is None, f"{name}: missing license lookup returns None")
+    expect(storage.license_state("missing") is None, f"{name}: missing license state returns None")
+
+    expect(storage.bind_machine("CONFORM-1", "fp-a", 2), f"{name}: bind the first machine")
+    expect(storage.record_validation("CONFORM-1", "fp-a", "success", "127.0.0.1", "bench") == 1, f"{name}: first success counts 1")
+    expect(storage.get_license("CONFORM-1").machine_fingerprint == "fp-a", f"{name}: first binding sets machine_fingerprint")
+    expect(storage.bind_machine("CONFORM-1", "fp-b", 2), f"{name}: bind a second machine within max_instances")
+    expect(storage.record_validation("CONFORM-1", "fp-b", "success") == 2, f"{name}: second success counts 2")
+    expect(storage.bind_machine("CONFORM-1", "fp-a", 2), f"{name}: rebinding a bound machine succeeds")
+    storage.record_validation("CONFORM-1", "fp-a", "success")
+    expect(not storage.bind_machine("CONFORM-1", "fp-c", 2), f"{name}: refuse a machine beyond max_instances")
+    expect(storage.record_validation("CONFORM-1", "fp-c", "max_instances_exceeded") is None, f"{name}: failures return no count")
+
+    license_record, bindings = storage.license_state("CONFORM-1")
+    expect(license_record.validation_count == 3 and license_record.last_validation is not None, f"{name}: validation counters")
+    expect([binding.machine_fingerprint for binding in bindings] == ["fp-a", "fp-b"], f"{name}: bindings ordered by last_used desc")
+
+    expect(not storage.update_license("missing", expires_at, 1), f"{name}: updating a missing license fails")
+    expect(storage.update_license("CONFORM-1", datetime.utcnow() - timedelta(days=1), 3), f"{name}: update a license")
+    expect(storage.get_license("CONFORM-1").max_instances == 3, f"{name}: update changes max_instances")
+
+    expect(storage.create_license("CONFORM-2", expires_at, 1), f"{name}: create a second license")
+    expect(storage.delete_license("CONFORM-2"), f"{name}: delete a license")
+    expect(not storage.delete_license("missing"), f"{name}: deleting a missing license fails")
+    expect(not storage.get_license("CONFORM-2").is_active, f"{name}: delete deactivates the license")
+
+    expect(storage.reap_stale_bindings(datetime.utcnow() - timedelta(days=1), 10) == 0, f"{name}: reaping keeps recently used bindings")
+    reap_cutoff = datetime.utcnow() + timedelta(seconds=1)
+    expect(storage.reap_stale_bindings(reap_cutoff, 1) == 1, f"{name}: reaping releases at most batch_size bindings")
+    expect(storage.reap_stale_bindings(reap_cutoff, 10) == 1, f"{name}: reaping releases the remaining stale bindings")
+    expect(storage.license_state("CONFORM-1")[1] == [], f"{name}: reaped bindings are no longer active")
+    expect(storage.bind_machine("CONFORM-1", "fp-c", 2), f"{name}: reaped slots can be bound again")
+    storage.record_validation("CONFORM-1", "fp-c", "success")
+
+    expect(storage.stats() == {
+        "total_licenses": 2,
+        "active_licenses": 1,
+        "expired_licenses": 1,
+        "recent_validations": 5
+    }, f"{name}: stats")
+
+def check_memory_recovery():
+    """A reopened memory store must match the state it had before, with and without a snapshot"""
+    directory = tempfile.mkdtemp()
+    storage = main.MemoryStorage(directory)
+    check_storage_conformance(storage)
+    before = (storage.licenses, storage.bindings, storage.stats())
+    storage.close()
+
+    replayed = main.MemoryStorage(directory)
+    expect((replayed.licenses, replayed.bindings, replayed.stats()) == before, "MemoryStorage: WAL replay restores state")
+    replayed.snapshot()
+    replayed.bind_machine("CONFORM-1", "fp-d", 3)
+    expected = (replayed.licenses, replayed.bindings, replayed.stats())
+    replayed.close()
+
+    recovered = main.MemoryStorage(directory)
+    expect((recovered.licenses, recovered.bindings, recovered.stats()) == expected, "MemoryStorage: snapshot plus WAL restores state")
+    expect(sorted(os.listdir(directory)) == ["snapshot.msgpack", "wal.00000001"], "MemoryStorage: snapshot prunes old WAL generations")
+    recovered.close()
+
+def bench_storage():
+    """Compare the activation hot path across storage backends"""
+    for name, storage in storage_backends().items():
+        check_storage_conformance(storage)
+    check_memory_recovery()
+    print("Storage conformance: ok")
+
+    print("Activation hot path (lookup + bind + log):")
+    baseline = None
+    for name, storage in storage_backends().items():
+        storage.create_license("BENCH-1", datetime.utcnow() + timedelta(days=30), 1)
+
+        def activation():
+            license_record = storage.get_license("BENCH-1")
+            storage.bind_machine("BENCH-1", "fp-bench", license_record.max_instances)
+            storage.record_validation("BENCH-1", "fp-bench", "success", "127.0.0.1", "bench")
+
+        seconds = timeit.timeit(activation, number=STORAGE_ITERATIONS)
+        report(f"{type(storage).__name__}", seconds, baseline, iterations=STORAGE_ITERATIONS)
+        baseline = baseline or seconds
+
+if __name__ == "__main__":
+    bench_serialization()
+    bench_storage()
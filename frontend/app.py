@@ -1,9 +1,16 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import platform
 import uuid
-from datetime import datetime
+import csv
+import io
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 import os
 
 # ========================= PAGE CONFIG & CUSTOM CSS =========================
@@ -110,6 +117,81 @@ st.markdown("""
 
 # ========================= CONFIG =========================
 API_URL = os.getenv("API_URL", "https://license-server-58kf.onrender.com")
+REQUEST_TIMEOUT = (5, 20)  # (connect, read) seconds
+STATS_CACHE_TTL = int(os.getenv("STATS_CACHE_TTL", 60))
+LIST_CACHE_TTL = int(os.getenv("LIST_CACHE_TTL", 30))
+BROWSE_SORT_FIELDS = {"Last Validation": "last_validation", "Validation Count": "validation_count", "Expiry": "expires_at"}
+BULK_MAX_WORKERS = 16
+BULK_OPERATIONS = ["Validate", "Create", "Update", "Delete"]
+
+@st.cache_resource
+def get_http_adapter():
+    """Shared keep-alive connection pool so repeated calls reuse the TLS connection"""
+    # Connection failures are retried for every method; status/read retries only for idempotent ones
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "PUT", "DELETE"})
+    )
+    return HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=16)
+
+def new_http_session(adapter):
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+@st.cache_resource
+def get_http_session():
+    """Session for calls made from the script thread"""
+    return new_http_session(get_http_adapter())
+
+_worker_sessions = threading.local()
+
+def worker_session(adapter):
+    """Per-thread session over the shared adapter; a requests.Session is not safe to share across threads"""
+    session = getattr(_worker_sessions, "session", None)
+    if session is None:
+        session = _worker_sessions.session = new_http_session(adapter)
+    return session
+
+def api_request(method, path, admin_token=None, session=None, **kwargs):
+    """Call the license server and return the decoded JSON body"""
+    headers = {"Authorization": f"Bearer {admin_token}"} if admin_token else None
+    response = (session or get_http_session()).request(method, f"{API_URL}{path}", headers=headers, timeout=REQUEST_TIMEOUT, **kwargs)
+    response.raise_for_status()
+    return response.json()
+
+@st.cache_data(ttl=STATS_CACHE_TTL, show_spinner=False)
+def fetch_stats(admin_token):
+    return api_request("GET", "/stats", admin_token)
+
+@st.cache_data(ttl=LIST_CACHE_TTL, show_spinner=False)
+def fetch_license_page(admin_token, sort, order, limit, cursor):
+    params = {"sort": sort, "order": order, "limit": limit}
+    if cursor:
+        params["cursor"] = cursor
+    return api_request("GET", "/licenses", admin_token, params=params)
+
+@st.cache_data(ttl=LIST_CACHE_TTL, show_spinner=False)
+def fetch_license_bindings(admin_token, license_key):
+    return api_request("GET", f"/licenses/{requests.utils.quote(license_key, safe='')}/bindings", admin_token)
+
+@st.cache_data(ttl=STATS_CACHE_TTL, show_spinner=False)
+def fetch_license_timeline(admin_token, license_key, days):
+    params = {
+        "license_key": license_key,
+        "bucket": "day",
+        "start": (datetime.utcnow() - timedelta(days=days)).isoformat()
+    }
+    return api_request("GET", "/stats/timeseries", admin_token, params=params)
+
+def invalidate_cached_reads():
+    """Drop cached admin reads after a license is created, updated or deleted"""
+    fetch_stats.clear()
+    fetch_license_page.clear()
+    fetch_license_bindings.clear()
 
 def get_system_info():
     return {
@@ -138,14 +220,12 @@ def activate_license():
                 payload = {
                     "license_key": license_key.strip(),
                     "fingerprint": system_info,
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
                     "version": "1.0.0"
                 }
                 with st.spinner("🔄 Activating license..."):
                     try:
-                        response = requests.post(f"{API_URL}/activate", json=payload, timeout=20)
-                        response.raise_for_status()
-                        data = response.json()
+                        data = api_request("POST", "/activate", json=payload)
                         if data.get("valid"):
                             st.success("✅ **License Activated Successfully!**")
                             st.info(f"**Message:** {data.get('message', 'Activated')}")
@@ -177,14 +257,12 @@ def validate_license():
                     return
                 payload = {
                     "license_key": license_key.strip(),
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
                     "version": "1.0.0"
                 }
                 with st.spinner("🔄 Validating..."):
                     try:
-                        response = requests.post(f"{API_URL}/validate", json=payload, timeout=20)
-                        response.raise_for_status()
-                        data = response.json()
+                        data = api_request("POST", "/validate", json=payload)
                         if data.get("valid"):
                             st.success("✅ **License is Valid and Active!**")
                             st.info(data.get("message", "All good"))
@@ -221,9 +299,8 @@ def create_license():
                 }
                 with st.spinner("🔄 Creating new license..."):
                     try:
-                        response = requests.post(f"{API_URL}/create", json=payload, headers={"Authorization": f"Bearer {admin_token.strip()}"})
-                        response.raise_for_status()
-                        data = response.json()
+                        data = api_request("POST", "/create", admin_token.strip(), json=payload)
+                        invalidate_cached_reads()
                         st.success("🎉 **License Created Successfully!**")
                         st.code(data.get('license_key'), language=None)
                         exp = datetime.fromisoformat(data['expires_at'])
@@ -258,9 +335,8 @@ def manage_license():
                 }
                 with st.spinner("🔄 Updating license..."):
                     try:
-                        response = requests.put(f"{API_URL}/update", json=payload, headers={"Authorization": f"Bearer {admin_token_update.strip()}"})
-                        response.raise_for_status()
-                        data = response.json()
+                        data = api_request("PUT", "/update", admin_token_update.strip(), json=payload)
+                        invalidate_cached_reads()
                         st.success("✅ **License Updated Successfully!**")
                         st.code(data.get('license_key'))
                         exp = datetime.fromisoformat(data['expires_at'])
@@ -294,9 +370,8 @@ def manage_license():
                 payload = {"license_key": license_key_delete.strip()}
                 with st.spinner("🗑️ Deleting license..."):
                     try:
-                        response = requests.delete(f"{API_URL}/delete", json=payload, headers={"Authorization": f"Bearer {admin_token_delete.strip()}"})
-                        response.raise_for_status()
-                        data = response.json()
+                        data = api_request("DELETE", "/delete", admin_token_delete.strip(), json=payload)
+                        invalidate_cached_reads()
                         st.success(f"🗑️ **License Deleted Permanently**\n\n{data.get('message', 'Successfully removed')}")
                     except requests.RequestException as e:
                         st.error(f"❌ Deletion failed: {str(e)}")
@@ -320,9 +395,7 @@ def stats():
                     return
                 with st.spinner("📈 Loading statistics..."):
                     try:
-                        response = requests.get(f"{API_URL}/stats", headers={"Authorization": f"Bearer {admin_token.strip()}"})
-                        response.raise_for_status()
-                        data = response.json()
+                        data = fetch_stats(admin_token.strip())
                         st.success("📊 **License System Overview**")
                         col1, col2, col3 = st.columns(3)
                         with col1:
@@ -338,6 +411,209 @@ def stats():
                         st.error(f"❌ Failed to load stats: {str(e)}")
         st.markdown("</div>", unsafe_allow_html=True)
 
+def browse_licenses():
+    with st.container():
+        st.markdown("<div class='section-card'>", unsafe_allow_html=True)
+        st.header("📚 License Browser")
+        st.markdown("### Admin-only: Page through licenses and drill into their activity")
+        admin_token = st.text_input("Admin Token (Browse)", type="password", placeholder="Required to browse licenses", key="browse_token").strip()
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            sort_label = st.selectbox("Sort By", list(BROWSE_SORT_FIELDS), key="browse_sort")
+        with col2:
+            order = st.selectbox("Order", ["desc", "asc"], key="browse_order")
+        with col3:
+            page_size = st.selectbox("Page Size", [25, 50, 100], key="browse_page_size")
+        if not admin_token:
+            st.info("🔑 Enter the admin token to load licenses.")
+            st.markdown("</div>", unsafe_allow_html=True)
+            return
+
+        # Cursors of the pages visited so far; reset whenever the ordering changes
+        view = (sort_label, order, page_size)
+        if st.session_state.get("browse_view") != view:
+            st.session_state["browse_view"] = view
+            st.session_state["browse_cursors"] = [None]
+        cursors = st.session_state["browse_cursors"]
+
+        try:
+            page = fetch_license_page(admin_token, BROWSE_SORT_FIELDS[sort_label], order, page_size, cursors[-1])
+        except requests.RequestException as e:
+            st.error(f"❌ Failed to load licenses: {str(e)}")
+            st.markdown("</div>", unsafe_allow_html=True)
+            return
+
+        licenses = page.get("licenses", [])
+        st.dataframe(licenses, use_container_width=True, hide_index=True)
+        col1, col2, col3 = st.columns([1, 1, 4])
+        with col1:
+            if st.button("◀ Previous", disabled=len(cursors) == 1, key="browse_prev"):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            if st.button("Next ▶", disabled=not page.get("next_cursor"), key="browse_next"):
+                cursors.append(page["next_cursor"])
+                st.rerun()
+        with col3:
+            st.caption(f"Page {len(cursors)} • {len(licenses)} licenses")
+
+        if not licenses:
+            st.markdown("</div>", unsafe_allow_html=True)
+            return
+
+        st.markdown("---")
+        st.subheader("🔍 License Details")
+        license_key = st.selectbox("License", [item["license_key"] for item in licenses], key="browse_selected")
+        days = st.select_slider("Timeline Range (days)", options=[7, 30, 90, 365], value=30, key="browse_days")
+        try:
+            details = fetch_license_bindings(admin_token, license_key)
+            timeline = fetch_license_timeline(admin_token, license_key, days)
+        except requests.RequestException as e:
+            st.error(f"❌ Failed to load license details: {str(e)}")
+            st.markdown("</div>", unsafe_allow_html=True)
+            return
+
+        bindings = details.get("bindings", [])
+        license_info = details.get("license", {})
+        active_bindings = sum(1 for binding in bindings if binding["is_active"])
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Slots Used", f"{active_bindings} / {license_info.get('max_instances', 'N/A')}")
+        with col2:
+            st.metric("Validations", license_info.get("validation_count", 0))
+        with col3:
+            st.metric("Status", "🟢 Active" if license_info.get("is_active") and not license_info.get("expired") else "🔴 Inactive")
+        st.dataframe(bindings, use_container_width=True, hide_index=True)
+
+        points = timeline.get("points", [])
+        if points:
+            results = sorted({result for point in points for result in point["results"]})
+            chart_data = {"day": [point["time"][:10] for point in points]}
+            for result in results:
+                chart_data[result] = [point["results"].get(result, 0) for point in points]
+            st.bar_chart(chart_data, x="day", y=results)
+        else:
+            st.info(f"No validations in the last {days} days.")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+def parse_license_keys(text):
+    """Read license keys from the first CSV column, skipping blanks, a header row and duplicates"""
+    keys = []
+    for row in csv.reader(io.StringIO(text)):
+        if row and row[0].strip() and row[0].strip().lower() != "license_key":
+            keys.append(row[0].strip())
+    return list(dict.fromkeys(keys))
+
+def run_bulk_operation(adapter, operation, license_key, admin_token, expires_in_days, max_instances):
+    """Run one operation for one key; called from worker threads, so it must not touch Streamlit"""
+    started = time.perf_counter()
+    session = worker_session(adapter)
+    try:
+        if operation == "Validate":
+            payload = {
+                "license_key": license_key,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "version": "1.0.0"
+            }
+            data = api_request("POST", "/validate", session=session, json=payload)
+            success = bool(data.get("valid"))
+        elif operation == "Create":
+            payload = {
+                "license_key": license_key,
+                "expires_in_days": expires_in_days,
+                "max_instances": max_instances
+            }
+            data = api_request("POST", "/create", admin_token, session=session, json=payload)
+            success = True
+        elif operation == "Update":
+            payload = {
+                "license_key": license_key,
+                "expires_in_days": expires_in_days,
+                "max_instances": max_instances
+            }
+            data = api_request("PUT", "/update", admin_token, session=session, json=payload)
+            success = True
+        else:
+            data = api_request("DELETE", "/delete", admin_token, session=session, json={"license_key": license_key})
+            success = True
+        message = data.get("message", "")
+    except requests.RequestException as e:
+        success = False
+        message = str(e)
+    return {
+        "license_key": license_key,
+        "operation": operation,
+        "success": success,
+        "message": message,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+
+def bulk_operations():
+    with st.container():
+        st.markdown("<div class='section-card'>", unsafe_allow_html=True)
+        st.header("📦 Bulk Operations")
+        with st.form(key='bulk_form'):
+            st.markdown("### Run one operation across many license keys")
+            operation = st.selectbox("Operation", BULK_OPERATIONS)
+            admin_token = st.text_input("Admin Token (Bulk)", type="password", placeholder="Required for create, update and delete")
+            uploaded = st.file_uploader("License keys CSV (first column)", type=["csv", "txt"])
+            pasted = st.text_area("Or paste license keys, one per line")
+            expires_in_days = st.slider("Validity Period (days)", 1, 1095, 365, key="bulk_days")
+            max_instances = st.slider("Maximum Allowed Activations", 1, 50, 1, key="bulk_instances")
+            workers = st.slider("Concurrent Requests", 1, BULK_MAX_WORKERS, 8)
+            confirm = st.checkbox("I understand bulk delete permanently deactivates every listed license")
+            submit = st.form_submit_button("Run Bulk Operation")
+
+        if submit:
+            # utf-8-sig drops the byte order mark Excel writes at the start of CSV exports
+            text = uploaded.getvalue().decode("utf-8-sig") if uploaded else pasted
+            license_keys = parse_license_keys(text or "")
+            if not license_keys:
+                st.error("⚠️ Provide at least one license key!")
+                return
+            if operation != "Validate" and not admin_token.strip():
+                st.error("🔑 Admin token is required for this operation!")
+                return
+            if operation == "Delete" and not confirm:
+                st.error("⚠️ You must confirm the deletion to proceed.")
+                return
+
+            progress = st.progress(0.0, text=f"0 / {len(license_keys)}")
+            throughput = st.empty()
+            live_table = st.empty()
+            results = []
+            started = time.perf_counter()
+            adapter = get_http_adapter()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(run_bulk_operation, adapter, operation, key, admin_token.strip(), int(expires_in_days), int(max_instances))
+                    for key in license_keys
+                ]
+                for done, future in enumerate(as_completed(futures), start=1):
+                    results.append(future.result())
+                    elapsed = time.perf_counter() - started
+                    progress.progress(done / len(license_keys), text=f"{done} / {len(license_keys)}")
+                    throughput.caption(f"⚡ {done / elapsed:.1f} keys/s • {elapsed:.1f}s elapsed")
+                    if done % 10 == 0 or done == len(license_keys):
+                        live_table.dataframe(results, use_container_width=True)
+            live_table.empty()
+
+            if operation != "Validate":
+                invalidate_cached_reads()
+            st.session_state["bulk_results"] = results
+
+        results = st.session_state.get("bulk_results")
+        if results:
+            succeeded = sum(1 for row in results if row["success"])
+            st.success(f"📦 **{succeeded} of {len(results)} succeeded**")
+            st.dataframe(results, use_container_width=True)
+            output = io.StringIO()
+            writer = csv.DictWriter(output, fieldnames=list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
+            st.download_button("Download Results CSV", output.getvalue(), file_name="bulk_results.csv", mime="text/csv")
+        st.markdown("</div>", unsafe_allow_html=True)
+
 # ========================= MAIN =========================
 def main():
     st.markdown("""
@@ -347,7 +623,7 @@ def main():
         </p>
     """, unsafe_allow_html=True)
     
-    tabs = st.tabs(["🔑 Activate", "✅ Validate", "🆕 Create", "⚙️ Manage", "📊 Statistics"])
+    tabs = st.tabs(["🔑 Activate", "✅ Validate", "🆕 Create", "⚙️ Manage", "📦 Bulk", "📚 Browse", "📊 Statistics"])
     
     with tabs[0]:
         activate_license()
@@ -358,6 +634,10 @@ def main():
     with tabs[3]:
         manage_license()
     with tabs[4]:
+        bulk_operations()
+    with tabs[5]:
+        browse_licenses()
+    with tabs[6]:
         stats()
     
     st.markdown("---")